@@ -1,37 +1,125 @@
-from flask import Blueprint,request,jsonify
-from services.inventory_service import InventoryService
-from datetime import datetime,timedelta
+from flask import Blueprint,request,Response,current_app
+from werkzeug.local import LocalProxy
+from datetime import date,timedelta
+import orjson
+from models import parse_date
 
 inventory_bp = Blueprint('inventory',__name__)
 
 
-service = InventoryService()
+def ojsonify(data, status=200):
+    # orjson is much faster than the stdlib json behind flask.jsonify
+    return Response(orjson.dumps(data), status=status, mimetype='application/json')
 
 
+def parse_body():
+    # orjson instead of request.get_json(); the raw body is not kept on the request
+    return orjson.loads(request.get_data(cache=False))
+
+
+def has_valid_date(item):
+    try:
+        parse_date(item.get('expirationDate'))
+    except ValueError:
+        return False
+    return True
+
+
+def has_valid_id(item):
+    # id is the primary key and has no default
+    return isinstance(item.get('id'),str) and item['id'] != ''
+
+
+INVALID_DATE = {'error':'Invalid expirationDate, expected YYYY-MM-DD'}
+MISSING_ID = {'error':'Each item needs a non-empty string id'}
+
+
+@inventory_bp.errorhandler(orjson.JSONDecodeError)
+def invalid_json(error):
+    return ojsonify({'error':'Invalid JSON'},400)
+
+
+# The service is created in create_app() and stored on app.extensions
+service = LocalProxy(lambda: current_app.extensions['inventory'])
+
 
 @inventory_bp.route("", methods=["POST"])
 def add_item():
-    data = request.get_json()
+    data = parse_body()
+    if not isinstance(data,dict):
+        return ojsonify({'error':'Expected a JSON object'},400)
+    if not has_valid_id(data):
+        return ojsonify(MISSING_ID,400)
+    if not has_valid_date(data):
+        return ojsonify(INVALID_DATE,400)
+
     result = service.add_item(data)
-    return jsonify(result), 201
+    if result.get('error'):
+        return ojsonify({'error': result['message']},400)
+    return ojsonify({'message': result['message'],'item': result['item']},201)
+
+@inventory_bp.route("/bulk", methods=["POST"])
+def bulk_add_items():
+    items = parse_body()
+
+    if not isinstance(items,list) or not items or not all(isinstance(item,dict) for item in items):
+        return ojsonify({'error':'Expected a non-empty JSON array of items'},400)
+
+    if not all(has_valid_id(item) for item in items):
+        return ojsonify(MISSING_ID,400)
+
+    if not all(has_valid_date(item) for item in items):
+        return ojsonify(INVALID_DATE,400)
+
+    result = service.bulk_add(items)
+    if result.get('error'):
+        return ojsonify({'error': result['message']},400)
+    return ojsonify({'message': result['message']},201)
 
 @inventory_bp.route("",methods=['GET'])
 def get_items():
-    return jsonify(service.get_items()),200
+    fields = request.args.get('fields')
+    if fields is not None:
+        # ?fields=id,name,quantity returns only those columns (not cached)
+        fields = list(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+        if not fields:
+            return ojsonify({"error":"fields must list at least one column"},400)
+        unknown = [field for field in fields if field not in service.COLUMNS]
+        if unknown:
+            return ojsonify({"error":f"Unknown fields: {', '.join(unknown)}"},400)
+        return ojsonify(service.get_items(fields),200)
+
+    etag = service.etag
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        etag, body = service.get_items_json()
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response
 
 @inventory_bp.route("/<item_id>",methods=['GET'])
 def get_item(item_id):
     result = service.get_item(item_id)
     if result is None:
-        return jsonify({"error":"Item not found"}),404
-    return jsonify(result),200
+        return ojsonify({"error":"Item not found"},404)
+    return ojsonify(result,200)
 
 
 @inventory_bp.route("/<item_id>",methods=['PUT'])
 def updated_item(item_id):
-    data = request.get_json()
-    service.update_item(item_id,data)
-    return jsonify({'message':'Item updated'}),200
+    data = parse_body()
+    if not isinstance(data,dict):
+        return ojsonify({'error':'Expected a JSON object'},400)
+    if not has_valid_date(data):
+        return ojsonify(INVALID_DATE,400)
+
+    result = service.update_item(item_id,data)
+    if result.get('error'):
+        if 'not found' in result.get('message', '').lower():
+            return ojsonify({'error': result['message']},404)
+        return ojsonify({'error': result['message']},400)
+    return ojsonify({'message':'Item updated'},200)
 
 @inventory_bp.route("/<item_id>",methods=['DELETE'])
 def delete_item(item_id):
@@ -48,32 +136,24 @@ def delete_item(item_id):
     # Check if there was an error
     if result.get('error'):
         if 'not found' in result.get('message', '').lower():
-            return jsonify({'error': result['message']}), 404
+            return ojsonify({'error': result['message']},404)
         else:
-            return jsonify({'error': result['message']}), 500
+            return ojsonify({'error': result['message']},500)
     
     # Success
-    return jsonify({'message': result['message']}), 200
+    return ojsonify({'message': result['message']},200)
 
 @inventory_bp.route('/expiring_items', methods=['GET'])
 def get_expiring_soon():
-    today = datetime.now().date()
+    today = date.today()
     threshold = today + timedelta(days=90)
 
-    expiring_soon = [
-        product for product in service.get_items()
-        if today < datetime.strptime(product['expirationDate'], '%Y-%m-%d').date() <= threshold
-    ]
-
-    already_expired = [
-        product for product in service.get_items()
-        if datetime.strptime(product['expirationDate'], '%Y-%m-%d').date() <= today 
-    ]
+    expiring_soon = service.get_expiring(today, threshold)
+    already_expired = service.get_expired(today)
 
-    print(expiring_soon)  # Debug: Print filtered products
-    return jsonify(
+    return ojsonify(
         {
             "expiring_soon":expiring_soon,
             "already_expired":already_expired
         }
-    ), 200
+    )
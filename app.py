@@ -1,7 +1,9 @@
 from flask import Flask
 from api.inventory_routes import inventory_bp
 from flask_cors import CORS  # Add this import
-from models import engine,Base,Product
+from models import Base,Product,normalize_expiration_dates
+from database import engine,SessionLocal
+from services.inventory_service import InventoryService
 
 
 def create_app():
@@ -13,11 +15,26 @@ def create_app():
     with app.app_context():
         Base.metadata.create_all(bind=engine)
 
+        # create_all skips tables that already exist, so add any missing indexes to an existing database
+        for index in Product.__table__.indexes:
+            index.create(engine,checkfirst=True)
+
+        with engine.begin() as connection:
+            normalize_expiration_dates(connection)
+
+    app.extensions['inventory'] = InventoryService(SessionLocal)
+
     # Register your blueprint
     app.register_blueprint(inventory_bp, url_prefix='/api/items')
 
+    # Hand the request's session back to the pool so threads never share one
+    @app.teardown_appcontext
+    def remove_session(exc):
+        SessionLocal.remove()
+
     return app
 
 if __name__ == '__main__':
+    # Dev server only; use gunicorn (see gunicorn.conf.py) to serve the API
     app = create_app()
-    app.run(debug=True)
+    app.run(debug=False)
@@ -1,12 +1,13 @@
 # database.py
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker,declarative_base
+from sqlalchemy.orm import sessionmaker,scoped_session,declarative_base
 
 
 DATABASE_URL = 'sqlite:///inventory.db'
 
 
 engine = create_engine(DATABASE_URL,echo=True)
-SessionLocal = sessionmaker(bind=engine)
+# one session per thread; removed at the end of each request in app.py
+SessionLocal = scoped_session(sessionmaker(bind=engine))
 
 Base = declarative_base()
\ No newline at end of file
@@ -0,0 +1,13 @@
+# gunicorn.conf.py
+# Run the API with:  gunicorn
+# (from the project root; same as gunicorn "app:create_app()" -c gunicorn.conf.py)
+
+wsgi_app = 'app:create_app()'
+bind = '127.0.0.1:5000'
+
+# One worker process with a thread pool: requests overlap their DB and
+# serialization work, while the in-process ETag cache in InventoryService
+# stays consistent (separate worker processes would each hold their own copy)
+workers = 1
+worker_class = 'gthread'
+threads = 8
@@ -1,5 +1,54 @@
-from sqlalchemy import Column,String,Integer,Float
-from database import Base,engine
+from sqlalchemy import Column,String,Integer,Float,Date,text
+from sqlalchemy.types import TypeDecorator
+from datetime import date,datetime
+from database import Base
+
+
+def parse_date(value):
+    # '' (an empty date field on the frontend) means no date; other strings must be YYYY-MM-DD
+    if value == '':
+        return None
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+def normalize_expiration_dates(connection):
+    # One-off cleanup for rows written while expirationDate was a plain string column:
+    # reading a DATE that is not YYYY-MM-DD raises, so rewrite what can be parsed and NULL the rest
+    rows = connection.execute(text(
+        "SELECT id, \"expirationDate\" FROM products "
+        "WHERE \"expirationDate\" IS NOT NULL"
+    )).all()
+
+    for item_id, raw in rows:
+        value = str(raw).strip()
+        try:
+            fixed = date.fromisoformat(value).isoformat()
+        except ValueError:
+            fixed = None
+        for fmt in ('%Y-%m-%d', '%m/%d/%Y', '%Y/%m/%d'):
+            if fixed is not None:
+                break
+            try:
+                fixed = datetime.strptime(value, fmt).date().isoformat()
+            except ValueError:
+                pass
+        if fixed == raw:
+            continue
+        connection.execute(
+            text("UPDATE products SET \"expirationDate\" = :value WHERE id = :id"),
+            {'value':fixed,'id':item_id}
+        )
+
+
+class ISODate(TypeDecorator):
+    # DATE column that also accepts the YYYY-MM-DD strings sent by the frontend
+    impl = Date
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return parse_date(value)
 
 
 class Product(Base):
@@ -10,11 +59,9 @@ class Product(Base):
     category = Column(String)
     quantity = Column(Integer)
     unit = Column(String)
-    expirationDate = Column(String)
+    expirationDate = Column(ISODate,index=True)
     supplier = Column(String)
     price = Column(Float)
     sku = Column(String)
     reorderLevel = Column(Integer)
     batchNumber = Column(String)
-
-Base.metadata.create_all(engine)
\ No newline at end of file
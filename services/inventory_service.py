@@ -1,88 +1,113 @@
-# Sample data
-from database import SessionLocal
 from models import Product
+from sqlalchemy import select,update,insert
+from sqlalchemy.orm import raiseload
+from uuid import uuid4
+import orjson
 
 
-session = SessionLocal()
+# Build _to_dict(product) from the mapped column attributes once at import, so
+# the dict literal is compiled instead of written out by hand for every field
+_to_dict_src = "def _to_dict(p):\n    return {" + ",".join(
+    f"{name!r}:p.{name}" for name in Product.__mapper__.column_attrs.keys()
+) + "}"
+_to_dict_ns = {}
+exec(_to_dict_src, _to_dict_ns)
+_to_dict = _to_dict_ns['_to_dict']
+
 
 class InventoryService:
-    def __init__(self):
-        # Preload sample data
+    COLUMNS = frozenset(Product.__table__.columns.keys())
+
+    def __init__(self, session):
+        # session is the scoped_session from database.py; it proxies to the
+        # session of the current thread
         self.session = session
-        
-  
-    
-    def get_items(self):
-        products = self.session.query(Product).all()
-        return [{
-            'id':p.id,
-            'name':p.name,
-            'category':p.category,
-            'quantity':p.quantity,
-            'unit':p.unit,
-            'expirationDate':p.expirationDate,
-            'supplier':p.supplier,
-            'price':p.price,
-            'sku':p.sku,
-            'reorderLevel':p.reorderLevel,
-            'batchNumber':p.batchNumber
-        } for p in products]
+        # bumped on every write so cached item lists can be invalidated;
+        # the random prefix keeps ETags from a previous process from matching
+        self._version = 0
+        self._etag_prefix = uuid4().hex[:8]
+        self._cache = None
+
+    @property
+    def etag(self):
+        return f'{self._etag_prefix}-{self._version}'
+
+    def get_items_json(self):
+        # serialized GET /api/items payload, rebuilt only when the version changes
+        etag = self.etag
+        cache = self._cache
+        if cache is not None and cache[0] == etag:
+            return cache
+        cache = (etag, orjson.dumps(self.get_items()))
+        self._cache = cache
+        return cache
+
+    def get_items(self, fields=None):
+        table = Product.__table__
+        if fields:
+            # only select the requested columns so unused fields never leave the DB
+            return self._fetch_rows(select(*[table.c[field] for field in fields]))
+        return self._fetch_rows(select(table))
+
+    def get_expiring(self, today, threshold):
+        return self._fetch_rows(select(Product.__table__).where(
+            Product.expirationDate > today,
+            Product.expirationDate <= threshold
+        ))
+
+    def get_expired(self, today):
+        return self._fetch_rows(select(Product.__table__).where(
+            Product.expirationDate <= today
+        ))
+
+    def _fetch_rows(self, stmt):
+        # core select skips ORM object hydration; rows come back keyed by column name
+        rows = self.session.execute(stmt).mappings().all()
+        return [dict(row) for row in rows]
 
     def get_item(self, item_id):
 
-        product = self.session.query(Product).filter(Product.id == item_id).first()
+        # raiseload('*') turns any lazy relationship load into an error instead of an N+1;
+        # add selectinload() for relations that are actually needed
+        product = self.session.get(Product,item_id,options=[raiseload('*')])
 
         if product is None:
             return None
 
-
-        return {
-            'id':product.id,
-            'name':product.name,
-            'category':product.category,
-            'quantity':product.quantity,
-            'unit':product.unit,
-            'expirationDate':product.expirationDate,
-            'supplier':product.supplier,
-            'price':product.price,
-            'sku':product.sku,
-            'reorderLevel':product.reorderLevel,
-            'batchNumber':product.batchNumber
-        }
+        return _to_dict(product)
     
     def update_item(self,item_id,data):
-        product = self.session.query(Product).filter(Product.id == item_id).first()
+        values = {key:value for key,value in data.items() if key in self.COLUMNS}
+        if not values:
+            item = self.get_item(item_id)
+            if item is None:
+                return {'message':'item not found','error':True}
+            return {'message':"item updated",'error':False,'item':item}
 
-        if product is None:
-            return {"message":"item not found"}
-
-        for key,value in data.items():
-            if hasattr(product,key):
-                setattr(product,key,value)
-
-        self.session.commit()
-
-        return {
-            "message":"item updated",
-            "item":{
-                'id':product.id,
-                'name':product.name,
-                'category':product.category,
-                'quantity':product.quantity,
-                'unit':product.unit,
-                'expirationDate':product.expirationDate,
-                'supplier':product.supplier,
-                'price':product.price,
-                'sku':product.sku,
-                'reorderLevel':product.reorderLevel,
-                'batchNumber':product.batchNumber
-            }
-        }
+        # single UPDATE ... RETURNING instead of loading the row and setting attributes
+        table = Product.__table__
+        stmt = update(table).where(table.c.id == item_id).values(**values).returning(*table.c)
+
+        try:
+            row = self.session.execute(stmt).mappings().first()
+
+            if row is None:
+                self.session.rollback()
+                return {'message':'item not found','error':True}
+
+            self.session.commit()
+            self._version += 1
+
+            return {'message':"item updated",'error':False,'item':dict(row)}
+
+        except Exception:
+            self.session.rollback()
+            return {'message':"Error updating item","error":True}
     
     def delete_item(self,item_id):
 
 
-        product = self.session.query(Product).filter(Product.id == item_id).first()
+        product = self.session.get(Product,item_id,options=[raiseload('*')])
 
         if product is None:
             return {'message':'item not found','error':True}
@@ -91,9 +116,40 @@ class InventoryService:
             self.session.delete(product)
 
             self.session.commit()
+            self._version += 1
 
             return {'message':"item deleted",'error':False}
         
         except Exception as e:
             self.session.rollback()
-            return {'message':f"Error deleteing item {str(e)}","error":True}
\ No newline at end of file
+            return {'message':f"Error deleteing item {str(e)}","error":True}
+
+    def add_item(self,data):
+        values = {key:value for key,value in data.items() if key in self.COLUMNS}
+        table = Product.__table__
+
+        try:
+            row = self.session.execute(insert(table).values(**values).returning(*table.c)).mappings().first()
+            self.session.commit()
+            self._version += 1
+
+            return {'message':"item added",'error':False,'item':dict(row)}
+
+        except Exception:
+            self.session.rollback()
+            return {'message':"Error adding item","error":True}
+
+    def bulk_add(self,items):
+        rows = [{key:value for key,value in item.items() if key in self.COLUMNS} for item in items]
+
+        try:
+            # one executemany INSERT and one commit for the whole batch
+            self.session.execute(insert(Product),rows)
+            self.session.commit()
+            self._version += 1
+
+            return {'message':f"{len(rows)} items added",'error':False}
+
+        except Exception:
+            self.session.rollback()
+            return {'message':"Error adding items","error":True}